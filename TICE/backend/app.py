@@ -1,12 +1,16 @@
 from fastapi import FastAPI, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, JSONResponse
+from fastapi.responses import FileResponse, JSONResponse, Response
 from datetime import datetime
 import concurrent.futures
+import asyncio
 import subprocess
 import requests
 import os
 
+from intel import normalize_data
+from artifact_store import store
+
 # ==========================================================
 # 🔐 API KEYS
 # ==========================================================
@@ -74,16 +78,12 @@ def gather_data(ip: str):
     return raw
 
 
-def compute_threat_score(raw):
+def compute_threat_score(records):
     """Compute unified threat score."""
-    vt_data = raw.get("VirusTotal", {}).get("data", {}).get("attributes", {}).get("last_analysis_stats", {})
-    abuse_data = raw.get("AbuseIPDB", {}).get("data", {})
-
-    malicious = vt_data.get("malicious", 0)
-    total = sum(vt_data.values()) or 1
-    vt_ratio = (malicious / total) * 100
+    vt = records["VirusTotal"]
+    vt_ratio = (vt.malicious / (vt.total_engines or 1)) * 100
 
-    abuse_score = abuse_data.get("abuseConfidenceScore", 0)
+    abuse_score = records["AbuseIPDB"].abuse_score
     unified = round((vt_ratio * 0.5 + abuse_score * 0.5), 2)
 
     if unified >= 80:
@@ -99,8 +99,9 @@ def compute_threat_score(raw):
 def run_tice_workflow(ip: str):
     """Run quick TICE lookup for dashboard."""
     raw = gather_data(ip)
-    score, verdict = compute_threat_score(raw)
-    ipinfo_data = raw.get("ipapi", {})
+    records = normalize_data(raw)
+    score, verdict = compute_threat_score(records)
+    vt, abuse, geo = records["VirusTotal"], records["AbuseIPDB"], records["ipapi"]
 
     report_text = f"""
 ================================================================================
@@ -110,10 +111,10 @@ Analysis Time: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
 Target IP: {ip}
 
 📍 GEOLOCATION:
-- Country: {ipinfo_data.get('country', 'Unknown')}
-- City: {ipinfo_data.get('city', 'Unknown')}
-- ASN: {ipinfo_data.get('org', 'Unknown').split()[0] if 'org' in ipinfo_data else 'Unknown'}
-- ISP: {ipinfo_data.get('org', 'Unknown')}
+- Country: {geo.country or 'Unknown'}
+- City: {geo.city or 'Unknown'}
+- ASN: {geo.asn or 'Unknown'}
+- ISP: {geo.org or 'Unknown'}
 
 🛡 SCORES:
 - Unified Reputation Score: {score}%
@@ -121,17 +122,17 @@ Target IP: {ip}
 - Confidence: 100%
 
 💀 DETECTIONS:
-- VirusTotal Malicious: {raw.get('VirusTotal', {}).get('data', {}).get('attributes', {}).get('last_analysis_stats', {}).get('malicious', 0)}
-- AbuseIPDB: {raw.get('AbuseIPDB', {}).get('data', {}).get('abuseConfidenceScore', 0)}% ({raw.get('AbuseIPDB', {}).get('data', {}).get('totalReports', 0)} reports)
+- VirusTotal Malicious: {vt.malicious}
+- AbuseIPDB: {abuse.abuse_score}% ({abuse.total_reports} reports)
 ================================================================================
 """
 
     categories = []
-    if "malicious" in str(raw.get("VirusTotal", {})).lower():
+    if "malware" in vt.categories:
         categories.append("Malware")
-    if "phish" in str(raw.get("VirusTotal", {})).lower():
+    if vt.phishing:
         categories.append("Phishing")
-    if "abuseConfidenceScore" in str(raw.get("AbuseIPDB", {})):
+    if abuse.ok:
         categories.append("Abuse Activity")
 
     return {
@@ -153,23 +154,24 @@ Target IP: {ip}
 @app.get("/api/forensic/{ip}")
 async def run_forensic_pipeline(ip: str, background_tasks: BackgroundTasks):
     """Run the forensic pipeline asynchronously."""
-    timestamp = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-    case_folder = f"Case_{timestamp}_{ip.replace('.', '_')}"
-    os.makedirs(case_folder, exist_ok=True)
+    case_id, case_folder = await store.new_case_async(ip)
 
     log_file = os.path.join(case_folder, "forensic.log")
-    pipeline_script = os.path.join(os.path.dirname(__file__), "forensic_pipeline.py")
+    pipeline_script = os.path.join(os.path.dirname(os.path.abspath(__file__)), "forensic_pipeline.py")
     cmd = ["python", pipeline_script, ip]
 
+    # Sync task: Starlette runs it in a threadpool, off the event loop
     def run_pipeline():
         with open(log_file, "w") as f:
-            subprocess.run(cmd, stdout=f, stderr=f, text=True)
+            subprocess.run(cmd, stdout=f, stderr=f, text=True, cwd=case_folder)
+        store.enforce_retention(keep=case_id)
 
     background_tasks.add_task(run_pipeline)
 
     return {
         "status": "running",
         "message": f"Forensic pipeline started for {ip}",
+        "case_id": case_id,
         "case_folder": case_folder,
         "log_file": log_file
     }
@@ -180,18 +182,22 @@ async def run_forensic_pipeline(ip: str, background_tasks: BackgroundTasks):
 @app.get("/api/report/{ip}")
 async def download_forensic_report(ip: str):
     """Return forensic PDF report if available."""
-    folders = [f for f in os.listdir(".") if f.startswith("Case_") and ip.replace('.', '_') in f]
-    if not folders:
-        return JSONResponse({"status": "processing", "message": "Report not yet generated."}, status_code=202)
-
-    latest = sorted(folders)[-1]
-    folder_path = os.path.join(".", latest)
-    pdf_files = [f for f in os.listdir(folder_path) if f.endswith(".pdf")]
-
-    if not pdf_files:
+    latest = await asyncio.to_thread(store.latest_case, ip)
+    if not latest:
+        archive = await asyncio.to_thread(store.latest_archive, ip)
+        pdf_bytes = await asyncio.to_thread(store.read_archived, archive, ".pdf") if archive else None
+        if not pdf_bytes:
+            return JSONResponse({"status": "processing", "message": "Report not yet generated."}, status_code=202)
+        return Response(
+            content=pdf_bytes,
+            media_type="application/pdf",
+            headers={"Content-Disposition": f'attachment; filename="Forensic_Report_{ip}.pdf"'}
+        )
+
+    pdf_path = await asyncio.to_thread(store.find_file, latest, ".pdf")
+    if not pdf_path:
         return JSONResponse({"status": "processing", "message": "PDF not ready yet."}, status_code=202)
 
-    pdf_path = os.path.join(folder_path, pdf_files[0])
     return FileResponse(
         path=pdf_path,
         filename=f"Forensic_Report_{ip}.pdf",
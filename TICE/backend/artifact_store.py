@@ -0,0 +1,307 @@
+# backend/artifact_store.py
+import os
+import json
+import time
+import shutil
+import asyncio
+import hashlib
+import zipfile
+import threading
+from uuid import uuid4
+from datetime import datetime
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Windows: only the in-process lock applies
+    fcntl = None
+
+# Everything lives under one root, independent of the process CWD
+ARTIFACT_ROOT = os.getenv(
+    "TICE_ARTIFACT_ROOT",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "artifacts"),
+)
+MAX_BYTES = int(float(os.getenv("TICE_ARTIFACT_MAX_MB", "2048")) * 1024 * 1024)
+MAX_AGE_DAYS = float(os.getenv("TICE_ARTIFACT_MAX_AGE_DAYS", "30"))
+COMPACT_AFTER_DAYS = float(os.getenv("TICE_ARTIFACT_COMPACT_AFTER_DAYS", "7"))  # 0 disables compaction
+
+MANIFEST = "manifest.json"
+
+
+def case_id_for(ip: str):
+    # Microseconds + random suffix: two runs for one IP in the same second must not share a folder
+    stamp = datetime.utcnow().strftime('%Y%m%dT%H%M%S%fZ')
+    return f"Case_{stamp}_{uuid4().hex[:6]}_{ip.replace('.', '_').replace(':', '_')}"
+
+
+def _dir_size(path):
+    total = 0
+    for dirpath, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, name))
+            except OSError:
+                pass
+    return total
+
+
+def _listdir(path):
+    try:
+        return os.listdir(path)
+    except FileNotFoundError:
+        return []
+
+
+class ArtifactStore:
+    """
+    Case artifacts on disk:
+      <root>/blobs/<aa>/<sha256><ext>   content-addressed, shared between cases
+      <root>/cases/<case_id>/           manifest.json, PDF, logs
+      <root>/archive/<case_id>.zip      compacted old cases
+    Retention evicts least-recently-used cases once the store exceeds
+    max_bytes, and drops anything not accessed for max_age_days.
+    Directories are created on first write. Mutations take a flock on
+    <root>/.lock, because the forensic pipeline subprocess has its own store.
+    """
+
+    def __init__(self, root=ARTIFACT_ROOT, max_bytes=MAX_BYTES,
+                 max_age_days=MAX_AGE_DAYS, compact_after_days=COMPACT_AFTER_DAYS):
+        self.root = os.path.abspath(root)
+        self.blob_dir = os.path.join(self.root, "blobs")
+        self.case_dir = os.path.join(self.root, "cases")
+        self.archive_dir = os.path.join(self.root, "archive")
+        self.max_bytes = max_bytes
+        self.max_age = max_age_days * 86400
+        self.compact_after = compact_after_days * 86400
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _locked(self):
+        """Serialize store mutations across threads and processes."""
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.root, exist_ok=True)
+            with open(os.path.join(self.root, ".lock"), "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    # ---------------- Cases ----------------
+    def new_case(self, ip: str):
+        """Create a case folder for `ip` and return (case_id, path)."""
+        case_id = case_id_for(ip)
+        path = os.path.join(self.case_dir, case_id)
+        with self._locked():
+            os.makedirs(self.case_dir, exist_ok=True)
+            os.makedirs(path, exist_ok=False)
+            self._write_manifest(path, {"ip": ip, "created": time.time(), "blobs": {}})
+        return case_id, path
+
+    def case_path(self, case_id: str):
+        return os.path.join(self.case_dir, case_id)
+
+    def latest_case(self, ip: str):
+        """Return the newest live case id for `ip`, or None."""
+        suffix = "_" + ip.replace(".", "_").replace(":", "_")
+        cases = [c for c in _listdir(self.case_dir) if c.endswith(suffix)]
+        return sorted(cases)[-1] if cases else None
+
+    def latest_archive(self, ip: str):
+        suffix = "_" + ip.replace(".", "_").replace(":", "_") + ".zip"
+        archives = [a for a in _listdir(self.archive_dir) if a.endswith(suffix)]
+        return os.path.join(self.archive_dir, sorted(archives)[-1]) if archives else None
+
+    def touch(self, case_id: str):
+        """Mark a case as recently used for LRU eviction."""
+        try:
+            os.utime(os.path.join(self.case_path(case_id), MANIFEST))
+        except OSError:
+            pass
+
+    def find_file(self, case_id: str, ext: str):
+        """Path of the first file in a live case ending with `ext`, resolving blobs too."""
+        path = self.case_path(case_id)
+        if not os.path.isdir(path):
+            return None
+        self.touch(case_id)
+        for name in sorted(os.listdir(path)):
+            if name.endswith(ext):
+                return os.path.join(path, name)
+        for name, digest in sorted(self._read_manifest(path).get("blobs", {}).items()):
+            if name.endswith(ext):
+                return self.blob_path(digest)
+        return None
+
+    def read_archived(self, archive_path: str, ext: str):
+        """Bytes of the first member of a compacted case ending with `ext`, or None."""
+        with zipfile.ZipFile(archive_path) as zf:
+            for name in sorted(zf.namelist()):
+                if name.endswith(ext):
+                    os.utime(archive_path)
+                    return zf.read(name)
+        return None
+
+    # ---------------- Blobs ----------------
+    def blob_path(self, digest: str):
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def put_bytes(self, case_id: str, name: str, data: bytes):
+        """
+        Store `data` content-addressed and record it in the case manifest
+        under `name`. Identical content is written once. Returns the blob path.
+        """
+        digest = hashlib.sha256(data).hexdigest() + os.path.splitext(name)[1]
+        path = self.blob_path(digest)
+        case = self.case_path(case_id)
+        # Held across blob write + manifest update so retention never sees an unreferenced new blob
+        with self._locked():
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp = f"{path}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            manifest = self._read_manifest(case)
+            manifest.setdefault("blobs", {})[name] = digest
+            self._write_manifest(case, manifest)
+        return path
+
+    async def new_case_async(self, ip: str):
+        """new_case in a worker thread, for use from async endpoints."""
+        return await asyncio.to_thread(self.new_case, ip)
+
+    # ---------------- Retention ----------------
+    def enforce_retention(self, keep=None):
+        """
+        Compact cases older than compact_after, delete entries idle for longer
+        than max_age, then evict LRU entries until the store fits max_bytes.
+        The case id in `keep` (the one just built) is never compacted or evicted.
+        Returns the list of evicted case ids.
+        """
+        if not os.path.isdir(self.root):
+            return []
+        with self._locked():
+            now = time.time()
+            if self.compact_after > 0:
+                for case_id in _listdir(self.case_dir):
+                    if case_id == keep:
+                        continue
+                    path = self.case_path(case_id)
+                    if now - self._last_access(path) > self.compact_after:
+                        self._compact(case_id)
+
+            entries = self._entries()
+            refs = {}
+            for entry in entries:
+                for digest in entry["blobs"]:
+                    refs[digest] = refs.get(digest, 0) + 1
+            total = sum(e["size"] for e in entries) + _dir_size(self.blob_dir)
+
+            evicted = []
+            for entry in sorted(entries, key=lambda e: e["atime"]):
+                if entry["id"] == keep:
+                    continue
+                expired = self.max_age > 0 and now - entry["atime"] > self.max_age
+                if not expired and total <= self.max_bytes:
+                    break
+                total -= entry["size"]
+                if os.path.isdir(entry["path"]):
+                    shutil.rmtree(entry["path"], ignore_errors=True)
+                else:
+                    try:
+                        os.remove(entry["path"])
+                    except FileNotFoundError:
+                        pass
+                for digest in entry["blobs"]:
+                    refs[digest] -= 1
+                    if refs[digest] == 0:
+                        total -= self._remove_blob(digest)
+                evicted.append(entry["id"])
+
+            self._gc_blobs(refs)
+            return evicted
+
+    def _entries(self):
+        entries = []
+        for case_id in _listdir(self.case_dir):
+            path = self.case_path(case_id)
+            entries.append({
+                "id": case_id,
+                "path": path,
+                "atime": self._last_access(path),
+                "size": _dir_size(path),
+                "blobs": set(self._read_manifest(path).get("blobs", {}).values()),
+            })
+        for name in _listdir(self.archive_dir):
+            path = os.path.join(self.archive_dir, name)
+            entries.append({
+                "id": os.path.splitext(name)[0],
+                "path": path,
+                "atime": os.path.getmtime(path),
+                "size": os.path.getsize(path),
+                "blobs": set(),
+            })
+        return entries
+
+    def _compact(self, case_id):
+        """Zip a case (with its blobs materialized) into the archive and drop the live folder."""
+        path = self.case_path(case_id)
+        manifest = self._read_manifest(path)
+        os.makedirs(self.archive_dir, exist_ok=True)
+        archive = os.path.join(self.archive_dir, f"{case_id}.zip")
+        tmp = archive + ".tmp"
+        with zipfile.ZipFile(tmp, "w", compression=zipfile.ZIP_DEFLATED) as zf:
+            for name in os.listdir(path):
+                zf.write(os.path.join(path, name), arcname=name)
+            for name, digest in manifest.get("blobs", {}).items():
+                blob = self.blob_path(digest)
+                if os.path.exists(blob):
+                    zf.write(blob, arcname=name)
+        os.replace(tmp, archive)
+        os.utime(archive, (self._last_access(path),) * 2)
+        shutil.rmtree(path, ignore_errors=True)
+
+    def _gc_blobs(self, refs):
+        """Remove blobs no live case references (e.g. after compaction)."""
+        for sub in _listdir(self.blob_dir):
+            for digest in _listdir(os.path.join(self.blob_dir, sub)):
+                if not refs.get(digest) and not digest.endswith(".tmp"):
+                    self._remove_blob(digest)
+
+    def _remove_blob(self, digest):
+        path = self.blob_path(digest)
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            if not os.listdir(os.path.dirname(path)):
+                os.rmdir(os.path.dirname(path))
+            return size
+        except OSError:
+            return 0
+
+    # ---------------- Manifest helpers ----------------
+    def _last_access(self, case_path):
+        try:
+            return os.path.getmtime(os.path.join(case_path, MANIFEST))
+        except OSError:
+            return os.path.getmtime(case_path)
+
+    def _read_manifest(self, case_path):
+        try:
+            with open(os.path.join(case_path, MANIFEST)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _write_manifest(self, case_path, manifest):
+        tmp = os.path.join(case_path, MANIFEST + ".tmp")
+        with open(tmp, "w") as f:
+            json.dump(manifest, f)
+        os.replace(tmp, os.path.join(case_path, MANIFEST))
+
+
+store = ArtifactStore()
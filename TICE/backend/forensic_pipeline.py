@@ -1,4 +1,4 @@
-import os, json, time, re
+import os, io, json, time, re
 from datetime import datetime
 from collections import defaultdict
 import pandas as pd
@@ -10,6 +10,9 @@ from reportlab.lib.pagesizes import A4
 from reportlab.lib import colors
 from reportlab.lib.styles import getSampleStyleSheet
 
+from intel import normalize_data
+from artifact_store import store as default_store
+
 # ---------------- Actor and Weight Configs ----------------
 ACTOR_KEYWORDS = {
     "Mirai-family": ["mirai", "gafgyt", "bashlite", "telnet"],
@@ -39,31 +42,38 @@ def contains_any(text, keywords):
             return True
     return False
 
+def render_png(fig_dpi=200):
+    """Render the current matplotlib figure to PNG bytes and close it."""
+    buf = io.BytesIO()
+    plt.tight_layout()
+    plt.savefig(buf, format="png", dpi=fig_dpi)
+    plt.close()
+    return buf.getvalue()
+
 # ---------------- Main Generator ----------------
-def generate_report(ip, raw_data, report_dir="reports"):
+def generate_report(ip, raw_data, store=None):
     """
     Generates a forensic correlation report PDF for one IP.
     Uses cached data (from /api/lookup/<ip>).
+    Charts are stored as shared blobs; the PDF lives in the case folder.
     Returns: path to generated PDF.
     """
+    store = store or default_store
 
-    # --- Setup directories ---
-    case_dir = os.path.join(report_dir, f"Case_{ip}_{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}")
-    os.makedirs(case_dir, exist_ok=True)
+    # --- Setup case ---
+    case_id, case_dir = store.new_case(ip)
 
     # --- Extract key info ---
-    vt = raw_data.get("raw_data", {}).get("VirusTotal", {})
-    abuse = raw_data.get("raw_data", {}).get("AbuseIPDB", {})
-    ipapi = raw_data.get("raw_data", {}).get("ipapi", {})
-    shodan = raw_data.get("raw_data", {}).get("Shodan", {})
-
-    vt_malicious = vt.get("data", {}).get("attributes", {}).get("last_analysis_stats", {}).get("malicious", 0)
-    vt_suspicious = vt.get("data", {}).get("attributes", {}).get("last_analysis_stats", {}).get("suspicious", 0)
-    abuse_conf = abuse.get("data", {}).get("abuseConfidenceScore", 0)
-    open_ports = shodan.get("ports", [])
-    asn_org = ipapi.get("as", "") or ipapi.get("org", "")
-    country = ipapi.get("country", "")
-    city = ipapi.get("city", "")
+    records = normalize_data(raw_data.get("raw_data", {}))
+    vt, abuse, geo = records["VirusTotal"], records["AbuseIPDB"], records["ipapi"]
+
+    vt_malicious = vt.malicious
+    vt_suspicious = vt.suspicious
+    abuse_conf = abuse.abuse_score
+    open_ports = records["Shodan"].ports
+    asn_org = geo.org or ""
+    country = geo.country or ""
+    city = geo.city or ""
 
     # --- Threat confidence computation ---
     threat_conf = min(100, vt_malicious * 5 + vt_suspicious * 2 + abuse_conf * 0.5)
@@ -84,10 +94,7 @@ def generate_report(ip, raw_data, report_dir="reports"):
     plt.ylim(0, 100)
     plt.title("Threat Confidence Score")
     plt.ylabel("Score (0–100)")
-    chart_path = os.path.join(case_dir, "threat_chart.png")
-    plt.tight_layout()
-    plt.savefig(chart_path, dpi=200)
-    plt.close()
+    chart_path = store.put_bytes(case_id, "threat_chart.png", render_png())
 
     # --- Network Graph (ASN - IP - Actor) ---
     G = nx.Graph()
@@ -105,10 +112,7 @@ def generate_report(ip, raw_data, report_dir="reports"):
     nx.draw_networkx_edges(G, pos, width=1, alpha=0.7)
     plt.title("Actor Correlation Network")
     plt.axis("off")
-    graph_png = os.path.join(case_dir, "actor_graph.png")
-    plt.tight_layout()
-    plt.savefig(graph_png, dpi=200)
-    plt.close()
+    graph_png = store.put_bytes(case_id, "actor_graph.png", render_png())
 
     # --- PDF Report ---
     pdf_path = os.path.join(case_dir, f"Forensic_Report_{ip}.pdf")
@@ -165,5 +169,6 @@ def generate_report(ip, raw_data, report_dir="reports"):
 
     story.append(PageBreak())
     doc.build(story)
+    store.enforce_retention(keep=case_id)
 
     return pdf_path
\ No newline at end of file
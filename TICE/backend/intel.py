@@ -0,0 +1,160 @@
+from dataclasses import dataclass, field
+
+
+@dataclass(slots=True)
+class IntelRecord:
+    """
+    Normalized view of one provider response.
+    Holds only the fields the pipeline reads, so consumers never walk the
+    provider JSON themselves. `raw` is a plain back-reference to the payload
+    the record was built from (not a copy).
+    """
+    provider: str
+    raw_score: float = 0.0
+    categories: tuple = ()
+    confidence: float = 0.0
+    error: str | None = None
+
+    # VirusTotal
+    malicious: int = 0
+    suspicious: int = 0
+    total_engines: int = 0
+    phishing: bool = False
+
+    # AbuseIPDB
+    abuse_score: int = 0
+    total_reports: int = 0
+
+    # Geo (ip-api / ipinfo)
+    country: str | None = None
+    city: str | None = None
+    region: str | None = None
+    org: str | None = None
+    asn: str | None = None
+
+    # Shodan
+    ports: tuple = ()
+
+    raw: object = field(default=None, repr=False, compare=False)
+
+    @property
+    def ok(self):
+        return self.error is None
+
+
+def error_of(raw):
+    """Return the error message carried by a provider error wrapper, if any."""
+    if not isinstance(raw, dict):
+        return "Invalid response"
+    if raw.get("error"):
+        return str(raw["error"])
+    if raw.get("errors"):
+        return str(raw["errors"])
+    if raw.get("http_error"):
+        return str(raw["http_error"])
+    if raw.get("http_status") and raw.get("http_status") != 200:
+        return f"HTTP {raw['http_status']}: {raw.get('body', '')}"
+    return None
+
+
+# ---------------- Normalizers (one per provider) ----------------
+def normalize_virustotal(raw, provider="virustotal"):
+    error = error_of(raw)
+    if error:
+        return IntelRecord(provider=provider, error=error, raw=raw)
+    data = raw.get("data", {}).get("attributes", {})
+    stats = data.get("last_analysis_stats", {})
+    malicious = stats.get("malicious", 0)
+    total = sum(stats.values())
+    phishing = any(
+        "phish" in str(r.get("result") or "").lower() or "phish" in str(r.get("category") or "").lower()
+        for r in data.get("last_analysis_results", {}).values()
+    )
+    categories = []
+    if malicious > 0:
+        categories.append("malware")
+    if phishing:
+        categories.append("phishing")
+    return IntelRecord(
+        provider=provider,
+        raw_score=malicious / (total or 1),
+        categories=tuple(categories),
+        confidence=0.9,
+        malicious=malicious,
+        suspicious=stats.get("suspicious", 0),
+        total_engines=total,
+        phishing=phishing,
+        raw=raw,
+    )
+
+
+def normalize_abuseipdb(raw, provider="abuseipdb"):
+    error = error_of(raw)
+    data = raw.get("data") if not error else None
+    if not error and (not isinstance(data, dict) or "abuseConfidenceScore" not in data):
+        error = "Missing abuseConfidenceScore"
+    if error:
+        return IntelRecord(provider=provider, error=error, raw=raw)
+    score = data.get("abuseConfidenceScore") or 0
+    total = data.get("totalReports", 0)
+    return IntelRecord(
+        provider=provider,
+        raw_score=score / 100.0,
+        categories=("botnet",) if score > 70 else (("suspicious",) if score > 30 else ()),
+        confidence=0.9,
+        abuse_score=score,
+        total_reports=total,
+        raw=raw,
+    )
+
+
+def normalize_geo(raw, provider="ipapi"):
+    # Accepts both ip-api.com ("as", "regionName") and ipinfo.io ("org", "region") payloads
+    error = error_of(raw)
+    if error:
+        return IntelRecord(provider=provider, error=error, raw=raw)
+    org = raw.get("org") or raw.get("as") or ""
+    asn = raw.get("as") or org
+    return IntelRecord(
+        provider=provider,
+        confidence=1.0,
+        country=raw.get("country"),
+        city=raw.get("city"),
+        region=raw.get("regionName") or raw.get("region"),
+        org=org,
+        asn=asn.split()[0] if asn else "",
+        raw=raw,
+    )
+
+
+def normalize_shodan(raw, provider="shodan"):
+    error = error_of(raw) if raw is not None else "No response"
+    if error:
+        return IntelRecord(provider=provider, error=error, raw=raw)
+    # Shodan doesn't give a single 'score' — we return a small heuristic if needed
+    ports = tuple(raw.get("ports", []))
+    raw_score = min(1.0, len(ports) / 10) if ports else 0.0
+    return IntelRecord(provider=provider, raw_score=raw_score, confidence=0.6, ports=ports, raw=raw)
+
+
+def normalize_securitytrails(raw, provider="securitytrails"):
+    # Nothing downstream reads SecurityTrails fields yet; only the error state is kept
+    error = error_of(raw)
+    if error:
+        return IntelRecord(provider=provider, error=error, raw=raw)
+    return IntelRecord(provider=provider, confidence=0.6, raw=raw)
+
+
+# Keyed the same way as the gathered raw_data dict
+NORMALIZERS = {
+    "VirusTotal": normalize_virustotal,
+    "AbuseIPDB": normalize_abuseipdb,
+    "ipapi": normalize_geo,
+    "Shodan": normalize_shodan,
+    "SecurityTrails": normalize_securitytrails,
+}
+
+
+def normalize_data(raw):
+    """Build one IntelRecord per provider response."""
+    return {name: normalize(raw.get(name) or {}) for name, normalize in NORMALIZERS.items()}
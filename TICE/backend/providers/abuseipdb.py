@@ -1,5 +1,6 @@
 import httpx
 from config import ABUSEIPDB_API_KEY
+from intel import normalize_abuseipdb
 
 class AbuseipdbClient:
     name = "abuseipdb"
@@ -16,12 +17,4 @@ class AbuseipdbClient:
             return r.json()
 
     def normalize(self, raw):
-        data = raw.get("data", {})
-        score = data.get("abuseConfidenceScore", 0)
-        total = data.get("totalReports", 0)
-        return {
-            "provider": self.name,
-            "raw_score": score / 100.0,
-            "categories": ["botnet"] if score > 70 else (["suspicious"] if score > 30 else []),
-            "confidence": 0.9
-        }
+        return normalize_abuseipdb(raw, self.name)
@@ -1,4 +1,5 @@
 import httpx
+from intel import normalize_geo
 
 class IpapiClient:
     name = "ipapi"
@@ -11,13 +12,4 @@ class IpapiClient:
             return r.json()
 
     def normalize(self, raw):
-        return {
-            "provider": self.name,
-            "geo": {
-                "country": raw.get("country"),
-                "city": raw.get("city"),
-                "region": raw.get("regionName")
-            },
-            "asn": raw.get("as", ""),
-            "confidence": 1.0
-        }
+        return normalize_geo(raw, self.name)
@@ -1,6 +1,7 @@
 # backend/providers/securitytrails.py
 import os
 import httpx
+from intel import normalize_securitytrails
 
 # read key from environment (config already loads .env)
 SECURITYTRAILS_API_KEY = os.getenv("SECURITYTRAILS_API_KEY", "")
@@ -45,17 +46,4 @@ class SecurityTrailsClient:
                 return {"http_status": r.status_code, "body": r.text}
 
     def normalize(self, raw):
-        """
-        Optional: keep a tiny summary if you later want normalized fields.
-        If raw is an error wrapper, return an empty summary.
-        """
-        if not isinstance(raw, dict) or raw.get("http_status"):
-            return {"provider": self.name, "summary": {}, "confidence": 0}
-        # Example summary for domain responses (if present)
-        summary = {}
-        if raw.get("records") is not None:
-            # securitytrails domain endpoint often contains 'records' or 'subdomains'
-            summary["subdomains_count"] = len(raw.get("subdomains", [])) if raw.get("subdomains") else 0
-        if raw.get("whois"):
-            summary["whois"] = {"registrant": raw["whois"].get("registrant") if raw["whois"] else None}
-        return {"provider": self.name, "summary": summary, "confidence": 0.6}
+        return normalize_securitytrails(raw, self.name)
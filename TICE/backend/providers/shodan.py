@@ -1,5 +1,6 @@
 # backend/providers/shodan.py
 import httpx
+from intel import normalize_shodan
 from config import os, load_dotenv  # harmless; config already loads env
 from config import VIRUSTOTAL_API_KEY  # imported to ensure config is referenced
 from config import ABUSEIPDB_API_KEY
@@ -31,11 +32,4 @@ class ShodanClient:
             return r.json()
 
     def normalize(self, raw):
-        # We are showing raw outputs only in your current app; keep a minimal normalize for compatibility
-        # If raw contains error wrapper, just return empty summary
-        if raw is None or ("http_status" in raw and raw.get("http_status") != 200):
-            return {"provider": self.name, "raw_score": 0, "categories": [], "confidence": 0}
-        # Shodan doesn't give a single 'score' — we return a small heuristic if needed
-        ports = raw.get("ports", [])
-        raw_score = min(1.0, len(ports) / 10) if ports else 0.0
-        return {"provider": self.name, "raw_score": raw_score, "categories": [], "confidence": 0.6}
+        return normalize_shodan(raw, self.name)
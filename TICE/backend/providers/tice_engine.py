@@ -3,6 +3,8 @@ import json
 import time
 from datetime import datetime
 
+from intel import normalize_virustotal, normalize_abuseipdb, normalize_geo
+
 # --- API KEYS (You can move these to .env for security) ---
 VT_KEY = '7774cdd6342578cd2521aac72dc3937268f9393e0a330012a8da35dbefa94e48'
 ABUSE_KEY = '58503a9542ff135101ebee7b847e43f27ccb59cfcb84431b2b95128a424dcba1110af3fa3cec8ce8'
@@ -54,9 +56,13 @@ class ThreatIntelligenceEngine:
         ab = self.get_abuseipdb(ip)
         ipinfo = self.get_ipinfo(ip)
 
+        vt_rec = normalize_virustotal(vt)
+        ab_rec = normalize_abuseipdb(ab)
+        geo = normalize_geo(ipinfo)
+
         # --- Compute quick reputation summary ---
-        vt_score = vt.get("data", {}).get("attributes", {}).get("last_analysis_stats", {}).get("malicious", 0)
-        ab_score = ab.get("data", {}).get("abuseConfidenceScore", 0)
+        vt_score = vt_rec.malicious
+        ab_score = ab_rec.abuse_score
         rep_score = min(100, vt_score * 2 + ab_score / 2)
 
         if rep_score >= 70:
@@ -79,10 +85,10 @@ class ThreatIntelligenceEngine:
                 "reputation_score": rep_score,
                 "verdict": verdict,
                 "geo": {
-                    "country": ipinfo.get("country", "Unknown"),
-                    "city": ipinfo.get("city", "Unknown"),
-                    "org": ipinfo.get("org", "Unknown"),
-                    "asn": ipinfo.get("org", "Unknown").split()[0] if "org" in ipinfo else "Unknown"
+                    "country": geo.country or "Unknown",
+                    "city": geo.city or "Unknown",
+                    "org": geo.org or "Unknown",
+                    "asn": geo.asn or "Unknown"
                 }
             }
         }
@@ -1,5 +1,6 @@
 import httpx
 from config import VIRUSTOTAL_API_KEY
+from intel import normalize_virustotal
 
 class VtClient:
     name = "virustotal"
@@ -15,14 +16,4 @@ class VtClient:
             return r.json()
 
     def normalize(self, raw):
-        data = raw.get("data", {}).get("attributes", {})
-        stats = data.get("last_analysis_stats", {})
-        malicious = stats.get("malicious", 0)
-        total = sum(stats.values()) or 1
-        score = malicious / total
-        return {
-            "provider": self.name,
-            "raw_score": score,
-            "categories": ["malware"] if malicious > 0 else [],
-            "confidence": 0.9
-        }
+        return normalize_virustotal(raw, self.name)